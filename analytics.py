@@ -0,0 +1,157 @@
+"""
+Price analytics for the dashboard.
+Loads a URL's history into NumPy arrays once and computes everything in
+vectorized form, so it stays fast even for very long price histories.
+"""
+
+import threading
+import numpy as np
+import tracker
+
+
+# Number of data points used for the moving average and rolling volatility
+MOVING_AVERAGE_WINDOW = 20
+VOLATILITY_WINDOW = 20
+
+# Percentiles reported in the summary
+PERCENTILES = [5, 25, 50, 75, 95]
+
+# Cached results: {url: (write_version, result)}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _load_arrays(history):
+    """
+    Converts a list of {price, timestamp} dicts into NumPy arrays.
+
+    Returns:
+        tuple: (prices as float64, timestamps as seconds since epoch float64)
+    """
+    prices = np.fromiter((h['price'] for h in history), dtype=np.float64, count=len(history))
+    timestamps = np.array([h['timestamp'] for h in history], dtype='datetime64[us]')
+    seconds = timestamps.astype(np.int64) / 1e6
+    return prices, seconds
+
+
+def _window_sums(values, window):
+    """
+    Rolling sums over the last `window` values (fewer at the start of the series).
+
+    Returns:
+        tuple: (sums, counts) arrays the same length as values
+    """
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return cumulative[end] - cumulative[start], end - start
+
+
+def moving_average(prices, window=MOVING_AVERAGE_WINDOW):
+    """Simple moving average; early points average over what is available."""
+    sums, counts = _window_sums(prices, window)
+    return sums / counts
+
+
+def rolling_volatility(prices, window=VOLATILITY_WINDOW):
+    """
+    Rolling standard deviation of check-to-check returns (as a fraction).
+    The first point has no previous price, so its return counts as 0.
+    """
+    returns = np.zeros_like(prices)
+    returns[1:] = np.diff(prices) / np.where(prices[:-1] == 0, np.nan, prices[:-1])
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    sums, counts = _window_sums(returns, window)
+    sums_sq, _ = _window_sums(returns * returns, window)
+    mean = sums / counts
+    variance = np.maximum(sums_sq / counts - mean * mean, 0.0)
+    return np.sqrt(variance)
+
+
+def drawdown(prices):
+    """
+    Drop from the highest price seen so far, as a fraction (0 at the peak, negative below it).
+
+    Returns:
+        tuple: (drawdown, running_peak) arrays
+    """
+    peak = np.maximum.accumulate(prices)
+    safe_peak = np.where(peak == 0, 1.0, peak)
+    return (prices - peak) / safe_peak, peak
+
+
+def seconds_since_low(prices, seconds):
+    """Seconds elapsed at each point since the all-time low (so far) was last hit."""
+    running_low = np.minimum.accumulate(prices)
+    indices = np.arange(len(prices))
+    last_low_index = np.maximum.accumulate(np.where(prices <= running_low, indices, 0))
+    return seconds - seconds[last_low_index]
+
+
+def compute_analytics(history):
+    """
+    Computes summary stats and chart overlay series for a price history.
+
+    Args:
+        history: List of {price, timestamp} dicts from tracker.get_price_history
+
+    Returns:
+        dict: {'summary': {...}, 'series': {...}}, or None if history is empty
+    """
+    if not history:
+        return None
+
+    prices, seconds = _load_arrays(history)
+    draw, peak = drawdown(prices)
+    since_low = seconds_since_low(prices, seconds)
+    percentile_values = np.percentile(prices, PERCENTILES)
+
+    summary = {
+        'current_price': float(prices[-1]),
+        'lowest_price': float(prices.min()),
+        'highest_price': float(prices.max()),
+        'mean_price': float(prices.mean()),
+        'data_points': int(prices.size),
+        'percentiles': {str(p): float(v) for p, v in zip(PERCENTILES, percentile_values)},
+        'current_drawdown': float(draw[-1]),
+        'max_drawdown': float(draw.min()),
+        'seconds_since_low': float(since_low[-1]),
+    }
+
+    series = {
+        'moving_average': moving_average(prices).tolist(),
+        'volatility': rolling_volatility(prices).tolist(),
+        'drawdown': draw.tolist(),
+        'peak': peak.tolist(),
+        'seconds_since_low': since_low.tolist(),
+    }
+
+    return {'summary': summary, 'series': series}
+
+
+def get_analytics(url):
+    """
+    Gets analytics for a tracked URL's event page prices, reusing the cached
+    result until the next price is saved for that URL (or the price file
+    changes on disk). Listing prices are a different series and are left out.
+
+    Args:
+        url: The ticket URL
+
+    Returns:
+        dict: See compute_analytics, or None if there is no history
+    """
+    version = tracker.get_write_version(url)
+
+    with _cache_lock:
+        cached = _cache.get(url)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    result = compute_analytics(tracker.get_price_history(url, source=tracker.SOURCE_EVENT_PAGE))
+
+    with _cache_lock:
+        _cache[url] = (version, result)
+
+    return result
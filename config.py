@@ -12,6 +12,10 @@ load_dotenv()
 # Vivid Seats URL to monitor (or any ticket vendor URL)
 EVENT_URL = os.getenv('EVENT_URL', '')
 
+# Optional: Vivid Seats performer, venue or category pages (comma-separated)
+# Every event listed on these pages is tracked from a single fetch per page
+LISTING_URLS = [u.strip() for u in os.getenv('LISTING_URLS', '').split(',') if u.strip()]
+
 # Your email address for receiving alerts
 MY_EMAIL = os.getenv('MY_EMAIL', '')
 
@@ -24,6 +28,8 @@ EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')  # Use an app password, not you
 # Default is Gmail, but you can use other providers
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+# Set to false only for local mail servers that don't support STARTTLS
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
 
 # How often to check prices (in hours)
 CHECK_INTERVAL_HOURS = float(os.getenv('CHECK_INTERVAL_HOURS', '4'))
@@ -31,6 +37,20 @@ CHECK_INTERVAL_HOURS = float(os.getenv('CHECK_INTERVAL_HOURS', '4'))
 # Convert hours to seconds for time.sleep()
 CHECK_INTERVAL_SECONDS = CHECK_INTERVAL_HOURS * 3600
 
+# Scraper rate limiting (applied separately to each host, e.g. www.vividseats.com)
+# Maximum requests per second, and how many requests can be sent back-to-back
+HOST_REQUESTS_PER_SECOND = float(os.getenv('HOST_REQUESTS_PER_SECOND', '1'))
+HOST_BURST = int(os.getenv('HOST_BURST', '3'))
+
+# Retries with exponential backoff when a request fails or is throttled
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+BACKOFF_BASE_SECONDS = float(os.getenv('BACKOFF_BASE_SECONDS', '2'))
+BACKOFF_MAX_SECONDS = float(os.getenv('BACKOFF_MAX_SECONDS', '60'))
+
+# Circuit breaker: pause a host after this many failures in a row
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv('CIRCUIT_COOLDOWN_SECONDS', '300'))
+
 
 def validate_config():
     """
@@ -38,7 +58,7 @@ def validate_config():
     Returns True if valid, False otherwise.
     """
     required_vars = [
-        ('EVENT_URL', EVENT_URL),
+        ('EVENT_URL or LISTING_URLS', EVENT_URL or LISTING_URLS),
         ('MY_EMAIL', MY_EMAIL),
         ('EMAIL_PASSWORD', EMAIL_PASSWORD),
     ]
@@ -7,6 +7,8 @@ import os
 import json
 from flask import Flask, render_template_string, jsonify
 import tracker
+import analytics
+import ratelimit
 
 app = Flask(__name__)
 
@@ -88,6 +90,18 @@ DASHBOARD_HTML = """
                 <div class="stat-value">{{ data_points }}</div>
                 <div class="stat-label">Data Points</div>
             </div>
+            <div class="stat-card">
+                <div class="stat-value">${{ "%.2f"|format(median_price) }}</div>
+                <div class="stat-label">Median Price</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">{{ "%.1f"|format(current_drawdown * 100) }}%</div>
+                <div class="stat-label">Below Peak</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">{{ "%.1f"|format(hours_since_low) }}h</div>
+                <div class="stat-label">Since Lowest Price</div>
+            </div>
         </div>
 
         <div class="chart-container">
@@ -98,7 +112,7 @@ DASHBOARD_HTML = """
             const ctx = document.getElementById('priceChart').getContext('2d');
             const priceData = {{ price_data|safe }};
 
-            new Chart(ctx, {
+            const priceChart = new Chart(ctx, {
                 type: 'line',
                 data: {
                     labels: priceData.map(d => d.timestamp),
@@ -116,7 +130,7 @@ DASHBOARD_HTML = """
                 options: {
                     responsive: true,
                     plugins: {
-                        legend: { display: false },
+                        legend: { labels: { color: '#eee' } },
                         title: {
                             display: true,
                             text: 'Price History',
@@ -137,10 +151,50 @@ DASHBOARD_HTML = """
                                 callback: function(value) { return '$' + value; }
                             },
                             grid: { color: '#333' }
+                        },
+                        drawdown: {
+                            position: 'right',
+                            max: 0,
+                            ticks: {
+                                color: '#888',
+                                callback: function(value) { return (value * 100).toFixed(0) + '%'; }
+                            },
+                            grid: { display: false }
                         }
                     }
                 }
             });
+
+            // Add analytics overlays (moving average, peak, drawdown)
+            fetch('/api/analytics/{{ url_id }}')
+                .then(response => response.ok ? response.json() : null)
+                .then(result => {
+                    if (!result) return;  // No analytics yet - just show prices
+                    const series = result.series;
+                    priceChart.data.datasets.push({
+                        label: 'Moving Avg',
+                        data: series.moving_average,
+                        borderColor: '#ffb400',
+                        pointRadius: 0,
+                        fill: false
+                    }, {
+                        label: 'Peak',
+                        data: series.peak,
+                        borderColor: '#ff5c8a',
+                        borderDash: [5, 5],
+                        pointRadius: 0,
+                        fill: false
+                    }, {
+                        label: 'Drawdown',
+                        data: series.drawdown,
+                        yAxisID: 'drawdown',
+                        borderColor: 'rgba(136, 136, 136, 0.6)',
+                        pointRadius: 0,
+                        fill: false
+                    });
+                    priceChart.update();
+                })
+                .catch(() => {});
         </script>
 
         {% else %}
@@ -165,20 +219,25 @@ def dashboard():
 
     # Get the first tracked URL (you could extend this to show multiple)
     url = urls[0]
-    history = tracker.get_price_history(url)
+    # Only event page prices - listing "from" prices are a different series
+    history = tracker.get_price_history(url, source=tracker.SOURCE_EVENT_PAGE)
 
     if not history:
         return render_template_string(DASHBOARD_HTML, url=None)
 
-    prices = [h['price'] for h in history]
+    summary = analytics.get_analytics(url)['summary']
 
     return render_template_string(
         DASHBOARD_HTML,
         url=url,
-        current_price=prices[-1],
-        lowest_price=min(prices),
-        highest_price=max(prices),
-        data_points=len(prices),
+        url_id=0,
+        current_price=summary['current_price'],
+        lowest_price=summary['lowest_price'],
+        highest_price=summary['highest_price'],
+        data_points=summary['data_points'],
+        median_price=summary['percentiles']['50'],
+        current_drawdown=summary['current_drawdown'],
+        hours_since_low=summary['seconds_since_low'] / 3600,
         price_data=json.dumps(history)
     )
 
@@ -193,6 +252,30 @@ def api_prices():
     return jsonify(data)
 
 
+@app.route('/api/analytics/<int:url_id>')
+def api_analytics(url_id):
+    """
+    JSON API endpoint for price analytics.
+    url_id is the URL's position in the tracked URL list (0 = first URL).
+    """
+    urls = tracker.get_all_urls()
+    if url_id >= len(urls):
+        return jsonify({'error': 'Unknown URL id'}), 404
+
+    url = urls[url_id]
+    result = analytics.get_analytics(url)
+    if result is None:
+        return jsonify({'error': 'No price data yet'}), 404
+
+    return jsonify({'url': url, **result})
+
+
+@app.route('/api/hosts')
+def api_hosts():
+    """JSON API endpoint for the scraper's per-host rate limit and circuit breaker state."""
+    return jsonify(ratelimit.get_all_host_states())
+
+
 def run_dashboard():
     """Run the dashboard server."""
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,611 @@
+"""
+Local end-to-end load test for the price tracker.
+Starts a stand-in ticket site and an SMTP sink on localhost, runs main's
+check loop over thousands of synthetic events, and reports throughput,
+latency percentiles, alert correctness and memory growth.
+
+Nothing is sent to Vivid Seats or to a real mail account. Memory is
+measured with tracemalloc, which slows the checks down, so throughput is
+somewhat lower than in a normal run.
+
+Usage:
+    python loadtest.py --urls 2000 --rounds 3 --latency-ms 20 --error-rate 0.02
+    python loadtest.py --urls 2000 --listing-size 50    # listing page mode
+    python loadtest.py --urls 2000 --listing-size 50 --listing-offset 5
+"""
+
+import argparse
+import base64
+import email
+import json
+import os
+import random
+import re
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import config
+import main
+import ratelimit
+import tracker
+
+
+# Event page layouts - one for each method scraper.get_lowest_price tries
+EVENT_LAYOUTS = ['start_at', 'lowest_price', 'structured_data', 'price_class', 'page_prices']
+
+# Listing page layouts - one for each method scraper.parse_listing_prices tries
+LISTING_LAYOUTS = ['structured_data', 'event_cards']
+
+# Pulls the alert details back out of notifier.create_price_alert_message
+ALERT_PATTERN = re.compile(
+    r'Current price: \$([\d.]+).*Previous price: \$([\d.]+).*Check it out: (\S+)', re.DOTALL)
+
+
+class FakeTicketSite:
+    """
+    A stand-in for Vivid Seats serving synthetic event and listing pages.
+    Prices, response latency and error rate can all be controlled. Listing
+    pages show each event's "from" price as its event page price plus
+    listing_offset, since the two rarely match on the real site.
+    """
+
+    def __init__(self, event_count, listing_size=0, latency_ms=0, error_rate=0.0, seed=0,
+                 listing_offset=0.0):
+        self.event_count = event_count
+        self.listing_size = listing_size
+        self.listing_offset = listing_offset
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.prices = {i: round(self.random.uniform(40, 400), 2) for i in range(event_count)}
+
+        self.request_count = 0
+        self.error_count = 0
+        # Event pages requested since the last reset_event_fetches()
+        self.event_fetches = set()
+        self._lock = threading.Lock()
+
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                site._handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def event_url(self, event_id):
+        return f'{self.base_url}/event-{event_id}/production/{event_id}'
+
+    def event_urls(self):
+        return [self.event_url(i) for i in range(self.event_count)]
+
+    def listing_event_url(self, listing_id):
+        """URL of the first event on a listing page."""
+        return self.event_url(listing_id * self.listing_size)
+
+    def listing_price(self, event_price):
+        """The "from" price a listing page shows for an event page price."""
+        return round(max(1.0, event_price + self.listing_offset), 2)
+
+    def reset_event_fetches(self):
+        with self._lock:
+            self.event_fetches = set()
+
+    def listing_urls(self):
+        if not self.listing_size:
+            return []
+        count = (self.event_count + self.listing_size - 1) // self.listing_size
+        return [f'{self.base_url}/performer/{i}' for i in range(count)]
+
+    def change_prices(self, change_rate):
+        """Moves a random share of the prices up or down (mostly down)."""
+        prices = dict(self.prices)
+        for event_id, price in prices.items():
+            if self.random.random() < change_rate:
+                factor = self.random.uniform(0.7, 0.99) if self.random.random() < 0.7 else self.random.uniform(1.01, 1.3)
+                prices[event_id] = round(min(5000.0, max(20.0, price * factor)), 2)
+        # Swap in the whole dict so request threads never see a half-updated round
+        self.prices = prices
+
+    def _handle(self, request):
+        event_match = re.match(r'^/event-\d+/production/(\d+)$', request.path)
+        listing_match = re.match(r'^/performer/(\d+)$', request.path)
+
+        with self._lock:
+            self.request_count += 1
+            roll = self.random.random()
+            if event_match:
+                self.event_fetches.add(self.event_url(int(event_match.group(1))))
+
+        if self.latency_ms:
+            time.sleep(self.random.uniform(0, 2 * self.latency_ms) / 1000)
+
+        if roll < self.error_rate:
+            with self._lock:
+                self.error_count += 1
+            # Mix of "slow down" and "server error" responses
+            if roll < self.error_rate / 2:
+                request.send_response(429)
+                request.send_header('Retry-After', '0')
+            else:
+                request.send_response(503)
+            request.end_headers()
+            return
+
+        if event_match and int(event_match.group(1)) in self.prices:
+            body = self._event_page(int(event_match.group(1)))
+        elif listing_match and self.listing_size:
+            body = self._listing_page(int(listing_match.group(1)))
+        else:
+            request.send_response(404)
+            request.end_headers()
+            return
+
+        data = body.encode('utf-8')
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _event_page(self, event_id):
+        price = self.prices[event_id]
+        layout = EVENT_LAYOUTS[event_id % len(EVENT_LAYOUTS)]
+        name = f'Load Test Event {event_id}'
+
+        if layout == 'start_at':
+            content = f'<p>Tickets start at ${price:.2f}</p>'
+        elif layout == 'lowest_price':
+            content = f'<h2>What is the lowest price?</h2><p>The lowest price for {name} is ${price:.2f}.</p>'
+        elif layout == 'structured_data':
+            data = {'@type': 'MusicEvent', 'name': name, 'offers': {'@type': 'Offer', 'price': f'{price:.2f}'}}
+            content = f'<script type="application/ld+json">{json.dumps(data)}</script>'
+        elif layout == 'price_class':
+            content = (f'<div class="ticket-price">${price:.2f}</div>'
+                       f'<div class="ticket-price">${price * 1.5:.2f}</div>')
+        else:
+            content = (f'<ul><li>Section 101 Row A - ${price * 1.5:.2f}</li>'
+                       f'<li>Section 202 Row F - ${price:.2f}</li></ul>')
+
+        return f'<html><head><title>{name} Tickets</title></head><body><h1>{name}</h1>{content}</body></html>'
+
+    def _listing_page(self, listing_id):
+        prices = self.prices
+        start = listing_id * self.listing_size
+        event_ids = [i for i in range(start, start + self.listing_size) if i in prices]
+        layout = LISTING_LAYOUTS[listing_id % len(LISTING_LAYOUTS)]
+
+        if layout == 'structured_data':
+            events = [{
+                '@type': 'MusicEvent',
+                'name': f'Load Test Event {i}',
+                'url': f'/event-{i}/production/{i}',
+                'offers': {'@type': 'AggregateOffer', 'lowPrice': f'{self.listing_price(prices[i]):.2f}'},
+            } for i in event_ids]
+            content = f'<script type="application/ld+json">{json.dumps(events)}</script>'
+        else:
+            content = ''.join(
+                f'<div class="event-card"><a href="/event-{i}/production/{i}">Load Test Event {i}</a>'
+                f'<span>From ${self.listing_price(prices[i]):,.2f}</span></div>'
+                for i in event_ids)
+
+        return f'<html><head><title>Performer {listing_id} Tickets</title></head><body>{content}</body></html>'
+
+
+class SMTPSink:
+    """
+    A local SMTP server that accepts any login and keeps every message
+    it receives in memory instead of delivering it.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self._lock = threading.Lock()
+
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                sink._handle(self)
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle(self, conn):
+        def reply(*lines):
+            conn.wfile.write(''.join(f'{line}\r\n' for line in lines).encode('ascii'))
+
+        def read_line():
+            return conn.rfile.readline().decode('utf-8', 'replace').rstrip('\r\n')
+
+        reply('220 loadtest SMTP sink ready')
+        recipients = []
+
+        while True:
+            line = conn.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                reply('250-loadtest', '250-AUTH PLAIN LOGIN', '250 8BITMIME')
+            elif verb == 'AUTH':
+                parts = command.split()
+                if parts[1].upper() == 'LOGIN':
+                    reply('334 ' + base64.b64encode(b'Username:').decode('ascii'))
+                    read_line()
+                    reply('334 ' + base64.b64encode(b'Password:').decode('ascii'))
+                    read_line()
+                elif len(parts) < 3:
+                    reply('334 ')
+                    read_line()
+                reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                recipients = []
+                reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip().strip('<>'))
+                reply('250 OK')
+            elif verb == 'DATA':
+                reply('354 End data with <CR><LF>.<CR><LF>')
+                data_lines = []
+                while True:
+                    data_line = conn.rfile.readline()
+                    if not data_line or data_line in (b'.\r\n', b'.\n'):
+                        break
+                    if data_line.startswith(b'..'):
+                        data_line = data_line[1:]
+                    data_lines.append(data_line)
+                self._store(recipients, b''.join(data_lines))
+                reply('250 OK: queued')
+            elif verb == 'QUIT':
+                reply('221 Bye')
+                return
+            elif verb in ('RSET', 'NOOP'):
+                reply('250 OK')
+            else:
+                reply('502 Command not implemented')
+
+    def _store(self, recipients, raw_message):
+        message = email.message_from_bytes(raw_message)
+        body = ''
+        for part in message.walk():
+            if part.get_content_type() == 'text/plain':
+                body = part.get_payload(decode=True).decode('utf-8', 'replace')
+                break
+
+        with self._lock:
+            self.messages.append({'to': recipients, 'subject': message['Subject'], 'body': body})
+
+
+def _last_prices():
+    """
+    Gets the tracker's stored state for every URL.
+
+    Returns:
+        dict: {url: {'event_count', 'event_price', 'listing_count', 'listing_price'}}
+              with the number of saved prices and the last price (or None)
+              from each source
+    """
+    data = tracker._load_price_data()
+    state = {}
+    for url, history in data.items():
+        event_prices = [h['price'] for h in history
+                        if h.get('source', tracker.SOURCE_EVENT_PAGE) == tracker.SOURCE_EVENT_PAGE]
+        listing_prices = [h['price'] for h in history
+                          if h.get('source') == tracker.SOURCE_LISTING]
+        state[url] = {
+            'event_count': len(event_prices),
+            'event_price': event_prices[-1] if event_prices else None,
+            'listing_count': len(listing_prices),
+            'listing_price': listing_prices[-1] if listing_prices else None,
+        }
+    return state
+
+
+def _memory_mb():
+    """
+    Python memory allocated right now and at its highest since the last
+    call, in MB (from tracemalloc). Resets the peak for the next round.
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    return current / (1024 * 1024), peak / (1024 * 1024)
+
+
+def _check_alerts(urls, served, served_listing, before, after, messages, event_fetches=None):
+    """
+    Compares the alert emails from one round against what should have been sent.
+    Alerts compare event page prices only, as main.process_price does.
+
+    Args:
+        served: {url: event page price} the site served this round
+        served_listing: {url: listing "from" price} the site served this round
+        event_fetches: In listing mode, the event pages fetched this round.
+                       Each must be for a new event or confirm a drop the
+                       listing showed compared with its previous listing price.
+
+    Returns:
+        dict: Counts of expected, received, missing, unexpected and duplicate
+              alerts, saved prices that don't match the site, drops that were
+              missed because fetching failed, and unneeded event page fetches
+    """
+    empty = {'event_count': 0, 'event_price': None, 'listing_count': 0, 'listing_price': None}
+    expected = set()
+    wrong_saved_prices = 0
+    missed_drops = 0
+    unneeded_event_fetches = 0
+
+    for url in urls:
+        old = before.get(url, empty)
+        new = after.get(url, empty)
+        event_saved = new['event_count'] > old['event_count']
+        listing_saved = new['listing_count'] > old['listing_count']
+        old_event_price = old['event_price']
+
+        if event_saved and round(new['event_price'], 2) != served[url]:
+            wrong_saved_prices += 1
+        if listing_saved and round(new['listing_price'], 2) != served_listing[url]:
+            wrong_saved_prices += 1
+
+        if event_saved and old_event_price is not None and new['event_price'] < old_event_price:
+            expected.add((url, round(new['event_price'], 2), round(old_event_price, 2)))
+        elif old_event_price is not None and served[url] < old_event_price:
+            missed_drops += 1
+
+        # In listing mode an event page is only fetched to get a new event's
+        # starting price or to confirm a drop from the previous listing price
+        if event_fetches is not None and url in event_fetches:
+            needed = old_event_price is None or (
+                old['listing_price'] is not None and served_listing[url] < old['listing_price'])
+            if not needed:
+                unneeded_event_fetches += 1
+
+    received = Counter()
+    for message in messages:
+        match = ALERT_PATTERN.search(message['body'])
+        if match and config.MY_EMAIL in message['to']:
+            received[(match.group(3), float(match.group(1)), float(match.group(2)))] += 1
+        else:
+            received[('unparseable', 0.0, 0.0)] += 1
+
+    return {
+        'expected': len(expected),
+        'received': sum(received.values()),
+        'missing': len(expected - set(received)),
+        'unexpected': sum(count for alert, count in received.items() if alert not in expected),
+        'duplicates': sum(count - 1 for alert, count in received.items() if alert in expected and count > 1),
+        'wrong_saved_prices': wrong_saved_prices,
+        'missed_drops': missed_drops,
+        'unneeded_event_fetches': unneeded_event_fetches,
+    }
+
+
+def run_load_test(event_count, rounds, listing_size=0, latency_ms=0, error_rate=0.0,
+                  change_rate=0.2, requests_per_second=1000.0, seed=0, listing_offset=0.0):
+    """
+    Runs main's check loop (main.check_all_prices) against the stand-in site
+    and SMTP sink. In per-event mode each check sets EVENT_URL to one event;
+    in listing mode each check sets LISTING_URLS to one listing page and
+    EVENT_URL to an event on it, which check_all_prices must not fetch again.
+
+    Args:
+        event_count: Number of synthetic events to track
+        rounds: Number of check rounds (prices change between rounds)
+        listing_size: Events per listing page; 0 checks every event page separately
+        latency_ms: Average response latency of the stand-in site
+        error_rate: Share of requests answered with 429/503
+        change_rate: Share of prices that change between rounds
+        requests_per_second: Scraper rate limit for the stand-in site
+        seed: Random seed, so runs can be repeated
+        listing_offset: Difference between a listing's "from" price and the
+                        event page price (may be negative)
+
+    Returns:
+        dict: The load test report
+    """
+    site = FakeTicketSite(event_count, listing_size, latency_ms, error_rate, seed,
+                          listing_offset=listing_offset)
+    sink = SMTPSink()
+    site.start()
+    sink.start()
+
+    work_dir = tempfile.mkdtemp(prefix='loadtest-')
+    tracemalloc.start()
+
+    # Point everything at the local servers - never at a real site or mail account
+    tracker.PRICE_FILE = os.path.join(work_dir, 'price_history.json')
+    config.MY_EMAIL = 'alerts@loadtest.local'
+    config.EMAIL_FROM = 'tracker@loadtest.local'
+    config.EMAIL_PASSWORD = 'loadtest'
+    config.SMTP_SERVER = '127.0.0.1'
+    config.SMTP_PORT = sink.port
+    config.SMTP_USE_TLS = False
+    config.HOST_REQUESTS_PER_SECOND = requests_per_second
+    config.HOST_BURST = max(1, int(requests_per_second))
+    config.BACKOFF_BASE_SECONDS = 0.01
+    config.BACKOFF_MAX_SECONDS = 1
+    config.CIRCUIT_COOLDOWN_SECONDS = 1
+
+    urls = site.event_urls()
+    listing_urls = site.listing_urls()
+    if listing_urls:
+        checks = [([listing_url], site.listing_event_url(i)) for i, listing_url in enumerate(listing_urls)]
+    else:
+        checks = [([], url) for url in urls]
+    latencies = []
+    round_reports = []
+    start_time = time.perf_counter()
+
+    try:
+        with open(os.devnull, 'w') as devnull:
+            for round_number in range(1, rounds + 1):
+                if round_number > 1:
+                    site.change_prices(change_rate)
+                served = site.prices
+                before = _last_prices()
+                first_message = len(sink.messages)
+                site.reset_event_fetches()
+                round_start = time.perf_counter()
+
+                with redirect_stdout(devnull):
+                    for listing_urls_for_check, event_url in checks:
+                        config.LISTING_URLS = listing_urls_for_check
+                        config.EVENT_URL = event_url
+                        check_start = time.perf_counter()
+                        main.check_all_prices()
+                        latencies.append(time.perf_counter() - check_start)
+
+                round_seconds = time.perf_counter() - round_start
+                served_by_url = {site.event_url(i): price for i, price in served.items()}
+                listing_by_url = {url: site.listing_price(price) for url, price in served_by_url.items()}
+                report = _check_alerts(urls, served_by_url, listing_by_url, before, _last_prices(),
+                                       sink.messages[first_message:],
+                                       site.event_fetches if listing_urls else None)
+                report['round'] = round_number
+                report['seconds'] = round_seconds
+                report['memory_mb'], report['peak_memory_mb'] = _memory_mb()
+                round_reports.append(report)
+    finally:
+        tracemalloc.stop()
+        site.stop()
+        sink.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    total_seconds = time.perf_counter() - start_time
+    latencies_ms = np.array(latencies) * 1000
+
+    return {
+        'mode': (f'listing ({listing_size} events per page, listing offset ${listing_offset:+.2f})'
+                 if listing_urls else 'per-event'),
+        'events': event_count,
+        'rounds': rounds,
+        'checks': len(latencies),
+        'total_seconds': total_seconds,
+        'events_per_second': event_count * rounds / total_seconds,
+        'http_requests': site.request_count,
+        'http_requests_per_second': site.request_count / total_seconds,
+        'injected_errors': site.error_count,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies_ms, 50)),
+            'p90': float(np.percentile(latencies_ms, 90)),
+            'p99': float(np.percentile(latencies_ms, 99)),
+            'max': float(latencies_ms.max()),
+        },
+        'round_reports': round_reports,
+        'hosts': ratelimit.get_all_host_states(),
+    }
+
+
+def print_report(report):
+    """Prints the load test report in a readable form."""
+    latency = report['latency_ms']
+    totals = Counter()
+    for round_report in report['round_reports']:
+        totals.update({key: value for key, value in round_report.items()
+                       if key not in ('round', 'seconds', 'memory_mb', 'peak_memory_mb')})
+
+    print("="*60)
+    print("Load Test Results")
+    print("="*60)
+    print(f"  Mode: {report['mode']}")
+    print(f"  Events: {report['events']}, rounds: {report['rounds']}")
+    print(f"  Total time: {report['total_seconds']:.1f} seconds")
+    print(f"  Throughput: {report['events_per_second']:.1f} events/s")
+    print(f"  HTTP requests: {report['http_requests']} ({report['http_requests_per_second']:.1f}/s), "
+          f"injected errors: {report['injected_errors']}")
+    print(f"  Check latency: p50 {latency['p50']:.1f} ms, p90 {latency['p90']:.1f} ms, "
+          f"p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+
+    print("\nAlerts:")
+    print(f"  Expected: {totals['expected']}, received: {totals['received']}")
+    print(f"  Missing: {totals['missing']}, unexpected: {totals['unexpected']}, "
+          f"duplicates: {totals['duplicates']}, wrong saved prices: {totals['wrong_saved_prices']}")
+    print(f"  Drops missed because fetching failed: {totals['missed_drops']}")
+    print(f"  Unneeded event page fetches (listing mode): {totals['unneeded_event_fetches']}")
+
+    print("\nRounds:")
+    for round_report in report['round_reports']:
+        print(f"  Round {round_report['round']}: {round_report['seconds']:.1f} s, "
+              f"{round_report['expected']} alerts expected, "
+              f"memory {round_report['memory_mb']:.1f} MB (peak {round_report['peak_memory_mb']:.1f} MB)")
+    memory = [r['memory_mb'] for r in report['round_reports']]
+    print(f"  Memory retained since first round: {memory[-1] - memory[0]:+.1f} MB")
+
+    print("\nHosts:")
+    for host, status in report['hosts'].items():
+        print(f"  {host}: {status['state']}, {status['requests_per_second']} req/s, "
+              f"{status['total_failures']} failures")
+
+
+def alerts_correct(report):
+    """True if every round sent exactly the alerts it should have."""
+    return all(r['missing'] == 0 and r['unexpected'] == 0 and r['duplicates'] == 0
+               and r['wrong_saved_prices'] == 0 and r['unneeded_event_fetches'] == 0
+               for r in report['round_reports'])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Load test the price tracker against a local stand-in site.")
+    parser.add_argument('--urls', type=int, default=1000, help="number of synthetic events to track")
+    parser.add_argument('--rounds', type=int, default=3, help="number of check rounds")
+    parser.add_argument('--listing-size', type=int, default=0,
+                        help="events per listing page (0 = fetch every event page)")
+    parser.add_argument('--listing-offset', type=float, default=-5.0,
+                        help="listing \"from\" price minus event page price, in dollars")
+    parser.add_argument('--latency-ms', type=float, default=0, help="average response latency of the site")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 429/503")
+    parser.add_argument('--change-rate', type=float, default=0.2, help="share of prices changing each round")
+    parser.add_argument('--rate', type=float, default=1000.0, help="scraper requests per second limit")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    report = run_load_test(
+        event_count=args.urls,
+        rounds=args.rounds,
+        listing_size=args.listing_size,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        change_rate=args.change_rate,
+        requests_per_second=args.rate,
+        seed=args.seed,
+        listing_offset=args.listing_offset,
+    )
+    print_report(report)
+
+    if not alerts_correct(report):
+        print("\nAlert check FAILED")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main_cli()
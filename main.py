@@ -12,12 +12,15 @@ import tracker
 import notifier
 
 
-def check_price():
+def check_price(url=None):
     """
     Main function that checks the price, compares it, and sends alerts if needed.
     This is called repeatedly by the main loop.
+
+    Args:
+        url: The event URL to check (defaults to config.EVENT_URL)
     """
-    url = config.EVENT_URL
+    url = url or config.EVENT_URL
 
     print(f"\n{'='*60}")
     print(f"Checking price for: {url}")
@@ -30,8 +33,21 @@ def check_price():
         print("Could not get current price. Will try again next check.")
         return
 
+    process_price(url, current_price)
+
+
+def process_price(url, current_price):
+    """
+    Compares a freshly scraped event page price with the last stored event
+    page price, sends an alert if it dropped, and saves it.
+
+    Args:
+        url: The event URL
+        current_price: The price just scraped from this event's page
+    """
     # Step 2: Get the last known price from storage
-    last_price = tracker.get_last_price(url)
+    # (listing page prices are a different source and never trigger alerts)
+    last_price = tracker.get_last_price(url, source=tracker.SOURCE_EVENT_PAGE)
 
     if last_price is None:
         # This is the first time checking - just save the price
@@ -65,12 +81,81 @@ def check_price():
         tracker.save_price(url, current_price)
 
 
+def check_listing(listing_url):
+    """
+    Refreshes every event on a listing page (performer, venue or category)
+    from a single fetch. Listing prices are only a summary, so the event
+    page itself is fetched once for a new event (to get a starting price)
+    and to confirm a drop before alerting.
+
+    Args:
+        listing_url: The Vivid Seats listing page URL
+
+    Returns:
+        set: Normalized URLs of the events that were refreshed
+    """
+    print(f"\n{'='*60}")
+    print(f"Checking listing page: {listing_url}")
+    print(f"{'='*60}")
+
+    listing_prices = scraper.get_listing_prices(listing_url)
+
+    if not listing_prices:
+        print("Could not get listing prices. Will try again next check.")
+        return set()
+
+    # Match listed events to URLs we already track (which may be written differently)
+    tracked_urls = {scraper.normalize_event_url(u): u for u in tracker.get_all_urls()}
+
+    for event_url, listing_price in listing_prices.items():
+        url = tracked_urls.get(event_url, event_url)
+        # A listing's "from" price can sit above or below the event page price,
+        # so it is only ever compared with the previous listing price
+        last_listing_price = tracker.get_last_price(url, source=tracker.SOURCE_LISTING)
+
+        if tracker.get_last_price(url, source=tracker.SOURCE_EVENT_PAGE) is None:
+            # Alerts compare event page prices, so the first time we see an
+            # event we need one price from its own page to compare against
+            print(f"New event {url} - getting its starting price from the event page...")
+            event_price = scraper.get_lowest_price(url)
+            if event_price is None:
+                print("Could not get event page price. Will try again next check.")
+                continue
+            process_price(url, event_price)
+        elif tracker.has_price_dropped(listing_price, last_listing_price):
+            print(f"Listing shows a drop for {url} - confirming on the event page...")
+            confirmed_price = scraper.get_lowest_price(url)
+            if confirmed_price is None:
+                # Listing price isn't saved, so the drop is retried next check
+                print("Could not confirm price. Will try again next check.")
+                continue
+            process_price(url, confirmed_price)
+        else:
+            print(f"Listing price for {url}: ${listing_price:.2f} (no drop)")
+
+        tracker.save_price(url, listing_price, source=tracker.SOURCE_LISTING)
+
+    return set(listing_prices)
+
+
+def check_all_prices():
+    """
+    Checks every listing page, then the single event URL if no listing covered it.
+    """
+    refreshed = set()
+    for listing_url in config.LISTING_URLS:
+        refreshed |= check_listing(listing_url)
+
+    if config.EVENT_URL and scraper.normalize_event_url(config.EVENT_URL) not in refreshed:
+        check_price(config.EVENT_URL)
+
+
 def run_price_checker():
     """
     Background thread that runs the price checker continuously.
     """
     # Run the first check immediately
-    check_price()
+    check_all_prices()
 
     # Then run checks at regular intervals
     while True:
@@ -78,7 +163,7 @@ def run_price_checker():
         wait_hours = wait_seconds / 3600
         print(f"\nWaiting {wait_hours:.1f} hours until next check...")
         time.sleep(wait_seconds)
-        check_price()
+        check_all_prices()
 
 
 def main():
@@ -96,6 +181,7 @@ def main():
 
     print(f"\nConfiguration loaded:")
     print(f"  Event URL: {config.EVENT_URL}")
+    print(f"  Listing URLs: {', '.join(config.LISTING_URLS) or 'none'}")
     print(f"  Email: {config.MY_EMAIL}")
     print(f"  Check interval: {config.CHECK_INTERVAL_HOURS} hours")
 
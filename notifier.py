@@ -39,7 +39,8 @@ def send_price_alert(email_address, subject, message):
         
         print(f"Sending email to {email_address}...")
         server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()  # Enable encryption
+        if config.SMTP_USE_TLS:
+            server.starttls()  # Enable encryption
         server.login(config.EMAIL_FROM, config.EMAIL_PASSWORD)
         server.send_message(msg)
         server.quit()
@@ -0,0 +1,233 @@
+"""
+Per-host rate limiting for the scraper.
+Each host gets a token bucket (how fast we send requests) and a circuit
+breaker (stop sending requests for a while after repeated failures).
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import config
+
+
+# Circuit breaker states
+CLOSED = 'closed'        # Normal - requests allowed
+OPEN = 'open'            # Host is paused - requests are skipped
+HALF_OPEN = 'half_open'  # Cooldown over - one trial request allowed
+
+
+class HostLimiter:
+    """
+    Token bucket + circuit breaker for a single host.
+
+    The request rate adapts to what the host tolerates: it is cut in half
+    whenever the host throttles us (429/403) and slowly grows back towards
+    the configured maximum after each successful request.
+    """
+
+    def __init__(self, host, max_rate=None, burst=None,
+                 failure_threshold=None, cooldown_seconds=None):
+        self.host = host
+        self.max_rate = max_rate or config.HOST_REQUESTS_PER_SECOND
+        self.rate = self.max_rate
+        self.burst = burst or config.HOST_BURST
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.cooldown_seconds = cooldown_seconds or config.CIRCUIT_COOLDOWN_SECONDS
+
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trial_in_progress = False
+
+        self.total_requests = 0
+        self.total_failures = 0
+        self.total_throttled = 0
+
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add tokens for the time elapsed since the last refill."""
+        elapsed = now - self.last_refill
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.last_refill = now
+
+    def allow_request(self):
+        """
+        Checks the circuit breaker.
+
+        Returns:
+            bool: True if a request may be sent to this host right now
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self.open_until:
+                    return False
+                self.state = HALF_OPEN
+                self.trial_in_progress = False
+
+            if self.state == HALF_OPEN:
+                if self.trial_in_progress:
+                    return False
+                self.trial_in_progress = True
+
+            return True
+
+    def is_open(self):
+        """
+        Returns:
+            bool: True if the breaker is currently pausing requests to this host
+        """
+        with self._lock:
+            return self.state == OPEN
+
+    def acquire(self):
+        """Waits until the token bucket allows another request to this host."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Take the token now (the balance may go negative) so that
+            # concurrent callers queue up behind each other
+            self.tokens -= 1
+            wait_seconds = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            self.total_requests += 1
+
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def record_success(self):
+        """Closes the breaker and nudges the rate back up towards the maximum."""
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"Circuit for {self.host} closed - host is responding again")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.trial_in_progress = False
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def record_failure(self, throttled=False):
+        """
+        Records a failed request and opens the breaker if there were too many in a row.
+
+        Args:
+            throttled: True if the host told us to slow down (429/403)
+        """
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            if throttled:
+                self.total_throttled += 1
+                self.rate = max(self.max_rate / 64, self.rate / 2)
+
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._open(self.cooldown_seconds)
+
+    def pause(self, seconds):
+        """
+        Opens the breaker for at least a given number of seconds (e.g. a long
+        Retry-After). Never shortens a pause that is already longer.
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() + seconds <= self.open_until:
+                return
+            self._open(seconds)
+
+    def _open(self, seconds):
+        """Opens the breaker. Caller must hold the lock."""
+        self.state = OPEN
+        self.trial_in_progress = False
+        self.open_until = max(self.open_until, time.monotonic() + seconds)
+        print(f"Circuit for {self.host} opened - pausing requests for {seconds:.0f} seconds")
+
+    def get_status(self):
+        """
+        Gets the current state of this host's limiter.
+
+        Returns:
+            dict: Breaker state, current rate and request counters
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'state': self.state,
+                'requests_per_second': round(self.rate, 4),
+                'max_requests_per_second': self.max_rate,
+                'consecutive_failures': self.consecutive_failures,
+                'seconds_until_retry': round(max(0.0, self.open_until - now), 1) if self.state == OPEN else 0.0,
+                'total_requests': self.total_requests,
+                'total_failures': self.total_failures,
+                'total_throttled': self.total_throttled,
+            }
+
+
+# One limiter per host: {host: HostLimiter}
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(host):
+    """
+    Gets (or creates) the limiter for a host.
+
+    Args:
+        host: The host name, e.g. 'www.vividseats.com'
+
+    Returns:
+        HostLimiter: The shared limiter for that host
+    """
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(host)
+        return _limiters[host]
+
+
+def get_all_host_states():
+    """
+    Gets the limiter state for every host contacted so far.
+
+    Returns:
+        dict: {host: status dict}
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.get_status() for limiter in limiters}
+
+
+def backoff_seconds(attempt):
+    """
+    Exponential backoff with jitter for a retry attempt (0 = first retry).
+
+    Returns:
+        float: Seconds to wait, capped at config.BACKOFF_MAX_SECONDS
+    """
+    delay = min(config.BACKOFF_MAX_SECONDS, config.BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header (either seconds or an HTTP date).
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -6,7 +6,109 @@ Vivid Seats is more accessible than Ticketmaster and shows prices clearly.
 import requests
 from bs4 import BeautifulSoup
 import re
+import json
 import time
+from urllib.parse import urlparse, urljoin, urlunparse
+import config
+import ratelimit
+
+
+# Headers to mimic a real browser request
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Referer': 'https://www.google.com/',
+}
+
+# Status codes that mean the host wants us to slow down
+THROTTLE_STATUS_CODES = (403, 429)
+
+# Vivid Seats event pages look like .../<event-name>/production/1234567
+EVENT_LINK_PATTERN = re.compile(r'/production/\d+')
+
+# Listing cards show prices like "From $84" or "from $1,234.50"
+FROM_PRICE_PATTERN = re.compile(r'from\s+\$([\d,]+\.?\d*)', re.IGNORECASE)
+
+
+def fetch_page(url):
+    """
+    Fetches a page, respecting the per-host rate limit and circuit breaker.
+    Throttled (429/403) and failed requests are retried with exponential
+    backoff, honouring the Retry-After header when the host sends one.
+
+    Args:
+        url: The page URL to fetch
+
+    Returns:
+        requests.Response: The successful response, or None if the page could not be fetched
+    """
+    host = urlparse(url).netloc
+    limiter = ratelimit.get_host_limiter(host)
+
+    # Create a session to maintain cookies
+    session = requests.Session()
+
+    for attempt in range(config.MAX_RETRIES + 1):
+        if not limiter.allow_request():
+            status = limiter.get_status()
+            print(f"Skipping {url} - {host} is paused for {status['seconds_until_retry']:.0f} more seconds")
+            return None
+
+        limiter.acquire()
+
+        try:
+            print(f"Fetching Vivid Seats page: {url}")
+            response = session.get(url, headers=HEADERS, timeout=15)
+        except requests.RequestException as e:
+            print(f"Error fetching page: {e}")
+            limiter.record_failure()
+            if limiter.is_open():
+                # No point waiting to retry - the host is paused
+                return None
+            wait_seconds = ratelimit.backoff_seconds(attempt)
+        else:
+            if response.status_code < 400:
+                limiter.record_success()
+                return response
+
+            throttled = response.status_code in THROTTLE_STATUS_CODES
+            if not throttled and response.status_code < 500:
+                # Other client errors (e.g. 404) won't be fixed by retrying
+                print(f"Error fetching page: HTTP {response.status_code}")
+                limiter.record_success()
+                return None
+
+            print(f"Error fetching page: HTTP {response.status_code}")
+            limiter.record_failure(throttled=throttled)
+
+            retry_after = ratelimit.parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None and (retry_after > config.BACKOFF_MAX_SECONDS or limiter.is_open()):
+                # Too long to wait here, or the breaker just opened - make sure
+                # the host stays paused for at least as long as it asked
+                limiter.pause(retry_after)
+
+            if limiter.is_open():
+                # No point waiting to retry - the host is paused
+                return None
+
+            wait_seconds = ratelimit.backoff_seconds(attempt)
+            if retry_after is not None:
+                wait_seconds = max(wait_seconds, retry_after)
+
+        if attempt < config.MAX_RETRIES:
+            print(f"Retrying in {wait_seconds:.1f} seconds...")
+            time.sleep(wait_seconds)
+
+    print(f"Giving up on {url} after {config.MAX_RETRIES + 1} attempts")
+    return None
 
 
 def get_lowest_price(url):
@@ -20,27 +122,9 @@ def get_lowest_price(url):
         float: The lowest ticket price found, or None if unable to find price
     """
     try:
-        # Create a session to maintain cookies
-        session = requests.Session()
-        
-        # Set headers to mimic a real browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Referer': 'https://www.google.com/',
-        }
-        
-        print(f"Fetching Vivid Seats page: {url}")
-        response = session.get(url, headers=headers, timeout=15)
-        response.raise_for_status()  # Raise an error for bad status codes
+        response = fetch_page(url)
+        if response is None:
+            return None
         
         # Parse the HTML content
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -76,7 +160,6 @@ def get_lowest_price(url):
         script_tags = soup.find_all('script', type='application/ld+json')
         for script in script_tags:
             try:
-                import json
                 data = json.loads(script.string)
                 # Look for offers or price information in structured data
                 if isinstance(data, dict):
@@ -150,3 +233,137 @@ def get_lowest_price(url):
     except Exception as e:
         print(f"Error parsing page: {e}")
         return None
+
+
+def normalize_event_url(url):
+    """
+    Normalizes an event URL so the same event always maps to the same key
+    (drops query string, fragment and trailing slash).
+    """
+    parts = urlparse(url)
+    return urlunparse((parts.scheme, parts.netloc, parts.path.rstrip('/'), '', '', ''))
+
+
+def _offer_price(offers):
+    """Gets the lowest price from a JSON-LD offers dict or list, or None."""
+    if isinstance(offers, dict):
+        offers = [offers]
+    if not isinstance(offers, list):
+        return None
+
+    prices = []
+    for offer in offers:
+        if not isinstance(offer, dict):
+            continue
+        price_str = offer.get('lowPrice') or offer.get('price')
+        if price_str is None:
+            continue
+        try:
+            prices.append(float(str(price_str).replace(',', '')))
+        except ValueError:
+            continue
+
+    return min(prices) if prices else None
+
+
+def _structured_data_events(data):
+    """Yields every dict in a JSON-LD document that looks like an event with offers."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _structured_data_events(item)
+    elif isinstance(data, dict):
+        if 'url' in data and 'offers' in data:
+            yield data
+        for key in ('@graph', 'itemListElement', 'item', 'event', 'events'):
+            if key in data:
+                yield from _structured_data_events(data[key])
+
+
+def parse_listing_prices(html, base_url):
+    """
+    Extracts every event and its lowest price from a listing page's HTML.
+
+    Args:
+        html: The page HTML (str or bytes)
+        base_url: The listing page URL, used to resolve relative links
+
+    Returns:
+        dict: {event_url: lowest_price} (empty if no events were found)
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    prices = {}
+
+    def add_price(href, price):
+        event_url = normalize_event_url(urljoin(base_url, href))
+        if price > 0 and (event_url not in prices or price < prices[event_url]):
+            prices[event_url] = price
+
+    # Method 1: Structured data (JSON-LD) listing each event with its offers
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except json.JSONDecodeError:
+            continue
+        for event in _structured_data_events(data):
+            # Skip performer/venue entries - only event pages are tracked
+            if not isinstance(event['url'], str) or not EVENT_LINK_PATTERN.search(event['url']):
+                continue
+            price = _offer_price(event['offers'])
+            if price is not None:
+                add_price(event['url'], price)
+
+    if prices:
+        return prices
+
+    # Method 2: Event cards - a link to the event with a "from $X" price
+    # in the link itself or in the card around it
+    for link in soup.find_all('a', href=EVENT_LINK_PATTERN):
+        card = link
+        for _ in range(4):
+            match = FROM_PRICE_PATTERN.search(card.get_text(' '))
+            if match:
+                try:
+                    add_price(link['href'], float(match.group(1).replace(',', '')))
+                except ValueError:
+                    pass
+                break
+            parent = card.parent
+            # Stop before we reach a container that holds other events' cards
+            # (a single card often links to its event more than once)
+            if parent is None:
+                break
+            linked_events = {normalize_event_url(urljoin(base_url, a['href']))
+                             for a in parent.find_all('a', href=EVENT_LINK_PATTERN)}
+            if len(linked_events) > 1:
+                break
+            card = parent
+
+    return prices
+
+
+def get_listing_prices(listing_url):
+    """
+    Scrapes a Vivid Seats performer, venue or category page and returns the
+    "from" price of every event it lists, using a single page fetch.
+
+    Args:
+        listing_url: The Vivid Seats listing page URL
+
+    Returns:
+        dict: {event_url: lowest_price}, or None if the page could not be fetched
+    """
+    try:
+        response = fetch_page(listing_url)
+        if response is None:
+            return None
+
+        prices = parse_listing_prices(response.content, listing_url)
+        if not prices:
+            print("Warning: Could not find any events on Vivid Seats listing page.")
+        else:
+            print(f"Found {len(prices)} events on listing page")
+        return prices
+
+    except Exception as e:
+        print(f"Error parsing listing page: {e}")
+        return None
@@ -0,0 +1,96 @@
+"""
+Tests for price analytics in analytics.py.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import analytics
+import tracker
+
+
+URL = 'https://www.vividseats.com/show/production/1'
+
+PRICES = np.array([10.0, 20.0, 15.0, 5.0, 10.0])
+SECONDS = np.array([0.0, 60.0, 120.0, 180.0, 240.0])
+
+
+class SeriesTest(unittest.TestCase):
+
+    def test_moving_average(self):
+        np.testing.assert_allclose(analytics.moving_average(PRICES, window=2),
+                                   [10.0, 15.0, 17.5, 10.0, 7.5])
+
+    def test_rolling_volatility(self):
+        # Returns are [0, 1, -0.25, -2/3, 1]; std over each window of 2
+        np.testing.assert_allclose(analytics.rolling_volatility(PRICES, window=2),
+                                   [0.0, 0.5, 0.625, 5 / 24, 5 / 6])
+
+    def test_drawdown(self):
+        draw, peak = analytics.drawdown(PRICES)
+        np.testing.assert_allclose(draw, [0.0, 0.0, -0.25, -0.75, -0.5])
+        np.testing.assert_allclose(peak, [10.0, 20.0, 20.0, 20.0, 20.0])
+
+    def test_seconds_since_low(self):
+        np.testing.assert_allclose(analytics.seconds_since_low(PRICES, SECONDS),
+                                   [0.0, 60.0, 120.0, 0.0, 60.0])
+
+    def test_compute_analytics_summary(self):
+        history = [{'price': float(p), 'timestamp': f'2024-01-01T00:0{i}:00'}
+                   for i, p in enumerate(PRICES)]
+        summary = analytics.compute_analytics(history)['summary']
+
+        self.assertEqual(summary['current_price'], 10.0)
+        self.assertEqual(summary['lowest_price'], 5.0)
+        self.assertEqual(summary['highest_price'], 20.0)
+        self.assertEqual(summary['data_points'], 5)
+        self.assertEqual(summary['percentiles']['50'], 10.0)
+        self.assertEqual(summary['max_drawdown'], -0.75)
+        self.assertEqual(summary['seconds_since_low'], 60.0)
+
+    def test_empty_history(self):
+        self.assertIsNone(analytics.compute_analytics([]))
+
+
+class GetAnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        patcher = mock.patch.object(tracker, 'PRICE_FILE', os.path.join(work_dir.name, 'prices.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.dict(analytics._cache, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch('analytics.compute_analytics', wraps=analytics.compute_analytics)
+        self.compute_analytics = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cached_until_next_save(self):
+        tracker.save_price(URL, 90.0)
+
+        first = analytics.get_analytics(URL)
+        self.assertIs(analytics.get_analytics(URL), first)
+        self.assertEqual(self.compute_analytics.call_count, 1)
+
+        tracker.save_price(URL, 80.0)
+        second = analytics.get_analytics(URL)
+        self.assertEqual(self.compute_analytics.call_count, 2)
+        self.assertEqual(second['summary']['current_price'], 80.0)
+
+    def test_listing_prices_are_left_out(self):
+        tracker.save_price(URL, 90.0)
+        tracker.save_price(URL, 70.0, source=tracker.SOURCE_LISTING)
+
+        summary = analytics.get_analytics(URL)['summary']
+        self.assertEqual(summary['lowest_price'], 90.0)
+        self.assertEqual(summary['data_points'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
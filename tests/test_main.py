@@ -0,0 +1,92 @@
+"""
+Tests for the price checking flow in main.py.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import main
+import tracker
+
+
+EVENT_URL = 'https://www.vividseats.com/show/production/1'
+LISTING_URL = 'https://www.vividseats.com/performer'
+
+
+class CheckListingTest(unittest.TestCase):
+
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        patcher = mock.patch.object(tracker, 'PRICE_FILE', os.path.join(work_dir.name, 'prices.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch('notifier.send_price_alert')
+        self.send_price_alert = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check_event_page(self, price):
+        with mock.patch('scraper.get_lowest_price', return_value=price):
+            main.check_price(EVENT_URL)
+
+    def check_listing(self, listing_price, event_page_price):
+        """Runs one listing check and returns how many event page fetches it made."""
+        with mock.patch('scraper.get_listing_prices', return_value={EVENT_URL: listing_price}), \
+                mock.patch('scraper.get_lowest_price', return_value=event_page_price) as get_lowest_price:
+            main.check_listing(LISTING_URL)
+        return get_lowest_price.call_count
+
+    def test_listing_price_does_not_cause_false_alert(self):
+        self.check_event_page(90.0)
+        # Listing "from" price is higher than the event page price
+        self.check_listing(95.0, 90.0)
+        # Listing drops, but the event page price never changed
+        self.check_listing(93.0, 90.0)
+
+        self.send_price_alert.assert_not_called()
+        self.assertEqual(tracker.get_last_price(EVENT_URL, source=tracker.SOURCE_EVENT_PAGE), 90.0)
+
+    def test_confirmed_drop_alerts_against_last_event_page_price(self):
+        self.check_event_page(90.0)
+        self.check_listing(95.0, 90.0)
+        self.check_listing(85.0, 85.0)
+
+        self.send_price_alert.assert_called_once()
+        subject = self.send_price_alert.call_args[0][1]
+        self.assertIn('Save $5.00', subject)
+
+    def test_new_listing_event_gets_event_page_price_first(self):
+        self.check_listing(95.0, 90.0)
+        self.check_listing(85.0, 85.0)
+
+        self.send_price_alert.assert_called_once()
+        self.assertIn('Save $5.00', self.send_price_alert.call_args[0][1])
+
+    def test_listing_below_event_page_does_not_refetch_every_check(self):
+        # Listing "from" price is always $10 below the event page price
+        fetches = [self.check_listing(80.0, 90.0) for _ in range(5)]
+
+        self.assertEqual(fetches, [1, 0, 0, 0, 0])
+        self.send_price_alert.assert_not_called()
+
+        # A real drop moves both prices by the same amount
+        self.assertEqual(self.check_listing(70.0, 80.0), 1)
+        self.send_price_alert.assert_called_once()
+        self.assertIn('Save $10.00', self.send_price_alert.call_args[0][1])
+        self.assertEqual(self.check_listing(70.0, 80.0), 0)
+
+    def test_unconfirmed_drop_is_retried_next_check(self):
+        self.check_event_page(90.0)
+        self.check_listing(95.0, 90.0)
+        self.check_listing(80.0, None)
+
+        self.send_price_alert.assert_not_called()
+        self.assertEqual(tracker.get_last_price(EVENT_URL, source=tracker.SOURCE_LISTING), 95.0)
+
+        self.assertEqual(self.check_listing(80.0, 85.0), 1)
+        self.send_price_alert.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
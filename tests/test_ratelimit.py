@@ -0,0 +1,267 @@
+"""
+Tests for per-host rate limiting in ratelimit.py and its use in scraper.fetch_page.
+"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+import requests
+import config
+import ratelimit
+import scraper
+
+
+URL = 'https://www.vividseats.com/show/production/1'
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping just moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        for target in ('ratelimit.time', 'scraper.time'):
+            patcher = mock.patch(target, self.clock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # No jitter, so backoff is exactly BACKOFF_BASE_SECONDS * 2 ** attempt
+        patcher = mock.patch('ratelimit.random')
+        patcher.start().uniform.return_value = 1.0
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.dict(ratelimit._limiters, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.multiple(
+            config, HOST_REQUESTS_PER_SECOND=100.0, HOST_BURST=10, MAX_RETRIES=2,
+            BACKOFF_BASE_SECONDS=1.0, BACKOFF_MAX_SECONDS=60.0,
+            CIRCUIT_FAILURE_THRESHOLD=5, CIRCUIT_COOLDOWN_SECONDS=300.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_limiter(self, **kwargs):
+        options = dict(max_rate=2.0, burst=2, failure_threshold=3, cooldown_seconds=60.0)
+        options.update(kwargs)
+        return ratelimit.HostLimiter('example.com', **options)
+
+
+class TokenBucketTest(RateLimitTestCase):
+
+    def test_burst_then_waits_for_next_token(self):
+        limiter = self.make_limiter()
+
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+        limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_tokens_refill_over_time(self):
+        limiter = self.make_limiter()
+        limiter.acquire()
+        limiter.acquire()
+
+        self.clock.now += 1.0
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_rate_halves_when_throttled_and_grows_back_on_success(self):
+        limiter = self.make_limiter(failure_threshold=100)
+
+        limiter.record_failure(throttled=True)
+        self.assertEqual(limiter.rate, 1.0)
+        limiter.record_failure(throttled=True)
+        self.assertEqual(limiter.rate, 0.5)
+
+        limiter.record_success()
+        self.assertAlmostEqual(limiter.rate, 0.7)
+
+        for _ in range(20):
+            limiter.record_success()
+        self.assertEqual(limiter.rate, 2.0)
+
+    def test_rate_never_drops_below_floor(self):
+        limiter = self.make_limiter(failure_threshold=100)
+        for _ in range(20):
+            limiter.record_failure(throttled=True)
+        self.assertEqual(limiter.rate, 2.0 / 64)
+
+    def test_plain_failure_does_not_change_rate(self):
+        limiter = self.make_limiter()
+        limiter.record_failure()
+        self.assertEqual(limiter.rate, 2.0)
+
+
+class CircuitBreakerTest(RateLimitTestCase):
+
+    def test_opens_after_threshold_then_half_open_then_closes(self):
+        limiter = self.make_limiter()
+
+        limiter.record_failure()
+        limiter.record_failure()
+        self.assertTrue(limiter.allow_request())
+        limiter.record_failure()
+        self.assertEqual(limiter.state, ratelimit.OPEN)
+        self.assertFalse(limiter.allow_request())
+        self.assertEqual(limiter.get_status()['seconds_until_retry'], 60.0)
+
+        self.clock.now += 60.0
+        # Only a single trial request is let through
+        self.assertTrue(limiter.allow_request())
+        self.assertEqual(limiter.state, ratelimit.HALF_OPEN)
+        self.assertFalse(limiter.allow_request())
+
+        limiter.record_success()
+        self.assertEqual(limiter.state, ratelimit.CLOSED)
+        self.assertEqual(limiter.consecutive_failures, 0)
+        self.assertTrue(limiter.allow_request())
+        self.assertTrue(limiter.allow_request())
+
+    def test_failed_trial_reopens(self):
+        limiter = self.make_limiter(failure_threshold=1)
+        limiter.record_failure()
+
+        self.clock.now += 60.0
+        self.assertTrue(limiter.allow_request())
+        limiter.record_failure()
+
+        self.assertEqual(limiter.state, ratelimit.OPEN)
+        self.assertFalse(limiter.allow_request())
+
+    def test_success_resets_consecutive_failures(self):
+        limiter = self.make_limiter()
+        limiter.record_failure()
+        limiter.record_failure()
+        limiter.record_success()
+        limiter.record_failure()
+        limiter.record_failure()
+        self.assertEqual(limiter.state, ratelimit.CLOSED)
+
+    def test_pause_never_shortens_existing_pause(self):
+        limiter = self.make_limiter()
+        limiter.pause(600)
+        limiter.pause(10)
+        self.assertEqual(limiter.get_status()['seconds_until_retry'], 600.0)
+
+        limiter.pause(900)
+        self.assertEqual(limiter.get_status()['seconds_until_retry'], 900.0)
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(ratelimit.parse_retry_after('120'), 120.0)
+        self.assertEqual(ratelimit.parse_retry_after(' 0 '), 0.0)
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=90)
+        seconds = ratelimit.parse_retry_after(format_datetime(retry_at, usegmt=True))
+        self.assertAlmostEqual(seconds, 90, delta=2)
+
+    def test_http_date_in_past(self):
+        self.assertEqual(ratelimit.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(ratelimit.parse_retry_after(None))
+        self.assertIsNone(ratelimit.parse_retry_after(''))
+        self.assertIsNone(ratelimit.parse_retry_after('soon'))
+        self.assertIsNone(ratelimit.parse_retry_after('-5'))
+
+
+def response(status_code, retry_after=None):
+    result = mock.Mock(status_code=status_code, headers={})
+    if retry_after is not None:
+        result.headers['Retry-After'] = retry_after
+    return result
+
+
+class FetchPageTest(RateLimitTestCase):
+
+    def fetch(self, *responses):
+        """Runs fetch_page with the session returning (or raising) each item in turn."""
+        with mock.patch('scraper.requests.Session') as session_class:
+            session = session_class.return_value
+            session.get.side_effect = list(responses)
+            result = scraper.fetch_page(URL)
+        self.get_count = session.get.call_count
+        return result
+
+    def status(self):
+        return ratelimit.get_all_host_states()['www.vividseats.com']
+
+    def test_success(self):
+        ok = response(200)
+        self.assertIs(self.fetch(ok), ok)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_retries_server_error_with_backoff(self):
+        ok = response(200)
+        self.assertIs(self.fetch(response(503), requests.ConnectionError('reset'), ok), ok)
+        self.assertEqual(self.clock.sleeps, [1.0, 2.0])
+
+    def test_gives_up_after_max_retries(self):
+        self.assertIsNone(self.fetch(response(503), response(503), response(503)))
+        self.assertEqual(self.get_count, 3)
+        self.assertEqual(self.clock.sleeps, [1.0, 2.0])
+        self.assertEqual(self.status()['consecutive_failures'], 3)
+
+    def test_client_error_is_not_retried(self):
+        self.assertIsNone(self.fetch(response(404)))
+        self.assertEqual(self.get_count, 1)
+        self.assertEqual(self.status()['total_failures'], 0)
+
+    def test_short_retry_after_is_waited_out(self):
+        ok = response(200)
+        self.assertIs(self.fetch(response(429, '5'), ok), ok)
+        self.assertEqual(self.clock.sleeps, [5.0])
+        self.assertEqual(self.status()['total_throttled'], 1)
+
+    def test_long_retry_after_pauses_host(self):
+        self.assertIsNone(self.fetch(response(429, '3600')))
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(self.status()['state'], ratelimit.OPEN)
+        self.assertEqual(self.status()['seconds_until_retry'], 3600.0)
+
+    def test_retry_after_longer_than_cooldown_when_breaker_opens(self):
+        config.CIRCUIT_FAILURE_THRESHOLD = 1
+        self.assertIsNone(self.fetch(response(429, '45')))
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(self.status()['seconds_until_retry'], 300.0)
+
+        ratelimit._limiters.clear()
+        config.CIRCUIT_COOLDOWN_SECONDS = 30.0
+        self.assertIsNone(self.fetch(response(429, '45')))
+        self.assertEqual(self.status()['seconds_until_retry'], 45.0)
+
+    def test_no_sleep_when_failure_opens_breaker(self):
+        config.CIRCUIT_FAILURE_THRESHOLD = 2
+        self.assertIsNone(self.fetch(response(503), response(503), response(200)))
+        self.assertEqual(self.get_count, 2)
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_skips_request_while_host_is_paused(self):
+        ratelimit.get_host_limiter('www.vividseats.com').pause(60)
+        self.assertIsNone(self.fetch(response(200)))
+        self.assertEqual(self.get_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
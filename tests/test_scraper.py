@@ -0,0 +1,51 @@
+"""
+Tests for listing page parsing in scraper.py.
+"""
+
+import json
+import unittest
+import scraper
+
+
+LISTING_URL = 'https://www.vividseats.com/performer'
+
+
+def json_ld_page(data):
+    return f'<html><head><script type="application/ld+json">{json.dumps(data)}</script></head></html>'
+
+
+class ParseListingPricesTest(unittest.TestCase):
+
+    def test_card_with_several_links_to_same_event(self):
+        html = ('<div class="card"><a href="/a/production/1"><img></a>'
+                '<a href="/a/production/1">Show A</a><span>From $84</span></div>'
+                '<div class="card"><a href="/b/production/2">Show B</a><span>From $1,200.50</span></div>')
+
+        self.assertEqual(scraper.parse_listing_prices(html, LISTING_URL), {
+            'https://www.vividseats.com/a/production/1': 84.0,
+            'https://www.vividseats.com/b/production/2': 1200.5,
+        })
+
+    def test_structured_data_skips_non_event_urls(self):
+        html = json_ld_page([
+            {'@type': 'MusicGroup', 'url': 'https://www.vividseats.com/artist',
+             'offers': {'@type': 'AggregateOffer', 'lowPrice': '50'}},
+            {'@type': 'MusicEvent', 'url': '/a/production/1',
+             'offers': {'@type': 'AggregateOffer', 'lowPrice': '84'}},
+        ])
+
+        self.assertEqual(scraper.parse_listing_prices(html, LISTING_URL), {
+            'https://www.vividseats.com/a/production/1': 84.0,
+        })
+
+    def test_structured_data_falls_back_to_price_when_low_price_is_empty(self):
+        html = json_ld_page({'@type': 'MusicEvent', 'url': '/a/production/1',
+                             'offers': {'lowPrice': None, 'price': '84'}})
+
+        self.assertEqual(scraper.parse_listing_prices(html, LISTING_URL), {
+            'https://www.vividseats.com/a/production/1': 84.0,
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
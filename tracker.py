@@ -11,6 +11,15 @@ from datetime import datetime
 # File to store price history
 PRICE_FILE = 'price_history.json'
 
+# Where a saved price came from. Listing pages only show a summary "from"
+# price, so alerts only ever compare event page prices with each other.
+# Entries saved without a source are event page prices.
+SOURCE_EVENT_PAGE = 'event'
+SOURCE_LISTING = 'listing'
+
+# Counts writes per URL so cached results (e.g. analytics) know when to refresh
+_write_versions = {}
+
 
 def _load_price_data():
     """Load price data from JSON file."""
@@ -34,12 +43,14 @@ def _save_price_data(data):
         print(f"Error saving price file: {e}")
 
 
-def get_last_price(url):
+def get_last_price(url, source=None):
     """
     Gets the last known price for a given URL.
 
     Args:
         url: The ticket URL
+        source: Only consider prices from this source (SOURCE_EVENT_PAGE or
+                SOURCE_LISTING), or None for the last price from any source
 
     Returns:
         float: The last known price, or None if no price has been stored yet
@@ -47,24 +58,32 @@ def get_last_price(url):
     data = _load_price_data()
     history = data.get(url, [])
 
-    if not history:
-        return None
+    for entry in reversed(history):
+        if source is None or entry.get('source', SOURCE_EVENT_PAGE) == source:
+            return entry['price']
 
-    return history[-1]['price']
+    return None
 
 
-def get_price_history(url):
+def get_price_history(url, source=None):
     """
     Gets the full price history for a given URL.
 
     Args:
         url: The ticket URL
+        source: Only include prices from this source (SOURCE_EVENT_PAGE or
+                SOURCE_LISTING), or None for prices from every source
 
     Returns:
-        list: List of {price, timestamp} dicts, or empty list if none
+        list: List of {price, timestamp, source} dicts, or empty list if none
     """
     data = _load_price_data()
-    return data.get(url, [])
+    history = data.get(url, [])
+
+    if source is None:
+        return history
+
+    return [h for h in history if h.get('source', SOURCE_EVENT_PAGE) == source]
 
 
 def get_all_urls():
@@ -78,13 +97,14 @@ def get_all_urls():
     return list(data.keys())
 
 
-def save_price(url, price):
+def save_price(url, price, source=SOURCE_EVENT_PAGE):
     """
     Saves the current price for a given URL with timestamp.
 
     Args:
         url: The ticket URL
         price: The price to save (float)
+        source: Where the price came from (SOURCE_EVENT_PAGE or SOURCE_LISTING)
     """
     data = _load_price_data()
 
@@ -94,13 +114,34 @@ def save_price(url, price):
     # Add new price entry with timestamp
     data[url].append({
         'price': price,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'source': source
     })
 
     _save_price_data(data)
+    _write_versions[url] = _write_versions.get(url, 0) + 1
     print(f"Saved price ${price:.2f} for {url}")
 
 
+def get_write_version(url):
+    """
+    Gets a value that changes every time a price is saved for a URL.
+    Includes the price file's modification time, so writes made by another
+    process (e.g. a checker running separately from the dashboard) count too.
+
+    Args:
+        url: The ticket URL
+
+    Returns:
+        tuple: (writes for this URL in this process, price file mtime or None)
+    """
+    try:
+        mtime = os.stat(PRICE_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    return (_write_versions.get(url, 0), mtime)
+
+
 def has_price_dropped(current_price, last_price):
     """
     Checks if the current price is lower than the last known price.